@@ -36,6 +36,9 @@ setuptools.setup(
         'pyserial',
         'prompt_toolkit',
     ],
+    extras_require={
+        'uvloop': ['uvloop;platform_system!="Windows"'],
+    },
 
     entry_points={'console_scripts': ('treble = treble.cli:main',)},
     python_requires='>=3.7',
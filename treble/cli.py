@@ -121,4 +121,17 @@ async def _main():
 
 
 def main():
-    asyncio.run(_main())
+    # Use the libuv-based event loop if available, it has a considerably
+    # lower per-callback overhead than the stock one
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(_main())
+        return
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(_main())
+    else:
+        # No asyncio.Runner before 3.11, fall back to the loop policy
+        uvloop.install()
+        asyncio.run(_main())
@@ -31,8 +31,13 @@ class HCICmdHdr:
     opcode : int
     plen : int
 
+# Precompiled header unpacker
+_CMD_HDR = struct.Struct(HCICmdHdr.sig)
+
 class HCICmd(Packet):
 
+    HEADER_LEN = _CMD_HDR.size
+
     def __init__(self, cmd_cls = None, **kwargs):
         if cmd_cls:
             # Downstream command creation
@@ -51,10 +56,11 @@ class HCICmd(Packet):
             super().__init__(hdr_cls = HCICmdHdr, **kwargs)
 
     def header_len(self):
-        return struct.calcsize(HCICmdHdr.sig)
+        return HCICmd.HEADER_LEN
 
     def unpack_header(self):
-        self.hdr = self.unpack(HCICmdHdr)
+        self.hdr = HCICmdHdr(*_CMD_HDR.unpack_from(self._buf, 1 + self.idx))
+        self.idx += HCICmd.HEADER_LEN
 
     def payload_len(self):
         return self.hdr.plen
@@ -20,11 +20,25 @@ class HCIEvtHdr:
     code : int
     plen : int
 
+# Precompiled header unpacker
+_EVT_HDR = struct.Struct(HCIEvtHdr.sig)
+
 class HCIEvt(Packet):
 
+    HEADER_LEN = _EVT_HDR.size
+
+    _pool = []
+
     def __init__(self, **kwargs):
         super().__init__(hdr_cls = HCIEvtHdr, **kwargs)
 
+    def header_len(self):
+        return HCIEvt.HEADER_LEN
+
+    def unpack_header(self):
+        self.hdr = HCIEvtHdr(*_EVT_HDR.unpack_from(self._buf, 1 + self.idx))
+        self.idx += HCIEvt.HEADER_LEN
+
     def payload_len(self):
         return self.hdr.plen
 
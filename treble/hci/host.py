@@ -30,6 +30,8 @@ def handlers(cls):
     return cls
 
 def evt_handler(evt_cls):
+    # Handlers must return True if they keep a reference to the event past
+    # the call, otherwise the event is recycled as soon as they return
     def wrapper(fun):
         setattr(fun, ATTR_EVT_HANDLER, evt_cls.code)
         return fun
@@ -68,9 +70,16 @@ class HCIHost:
         await self.init()
 
     async def close(self):
+        # Close the transport first, the RX task only exits once the
+        # transport reports the end of the stream
+        await self._transport.close()
         await self._rx_task
-        await self._tx_cmd_task
-        self._transport.close()
+        # The TX command task waits for new commands forever
+        self._tx_cmd_task.cancel()
+        try:
+            await self._tx_cmd_task
+        except CancelledError:
+            pass
 
     async def init(self):
         # Reset the controller first
@@ -85,39 +94,53 @@ class HCIHost:
         log.debug('rx task started')
         while True:
             try:
-                pkt = await self._transport.recv()
+                pkts = await self._transport.recv_many()
             except CancelledError:
                 # Here for compatibility with 3.7
                 raise
+            except OSError as e:
+                # Transport closed or broken, nothing more will be received
+                log.debug(f'_rx_task: {e}: exiting')
+                return
             except Exception as e:
-                log.debug(f'_rx_task: {e}')
-            else:
+                # Retrying could spin without ever yielding to the loop
+                log.error(f'_rx_task: {e}: exiting')
+                return
+
+            # Process the whole batch before going back to the loop
+            for pkt in pkts:
                 if not pkt:
                     # Broken RX Path
                     log.debug('_rx_task exiting')
-                    break
+                    return
                 elif self._mon:
                     self._mon.feed_rx(0, pkt)
 
-            if isinstance(pkt, HCIEvt):
-                self._rx_evt(pkt)
-            elif instance(pkt, HCIACLData):
-                self._rx_acl(pkt)
-            else:
-                log.error('Invalid rx type: {type(pkt)}')
-
-    def _rx_evt(self, evt: HCIEvt):
+                if isinstance(pkt, HCIEvt):
+                    keep = self._rx_evt(pkt)
+                elif isinstance(pkt, HCIACLData):
+                    keep = self._rx_acl(pkt)
+                else:
+                    log.error('Invalid rx type: {type(pkt)}')
+                    continue
+                if not keep:
+                    # Fully processed and not kept by a handler, recycle it
+                    pkt.release()
+
+    def _rx_evt(self, evt: HCIEvt) -> bool:
         log.debug(f'evt rx: {evt}')
         # Look for a handler
         try:
             handler = self.evt_handlers[evt.hdr.code]
         except KeyError:
             log.warn(f'Discarding event with code: {evt.hdr.code}')
+            return False
         else:
-            handler(self, evt)
+            return bool(handler(self, evt))
 
-    def _rx_acl(self, acl: HCIACLData):
-        log.debug(f'acl rx: {evt}')
+    def _rx_acl(self, acl: HCIACLData) -> bool:
+        log.debug(f'acl rx: {acl}')
+        return False
 
     async def _tx_cmd_task(self):
         log.debug('tx cmd task started')
@@ -5,7 +5,7 @@
 
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 
 HCI_TRANSPORT_UART = 'uart'
 HCI_TRANSPORT_TCP = 'tcp'
@@ -33,5 +33,9 @@ class HCITransport(ABC):
     async def recv(self, timeout: int) -> Optional[bytearray]:
     	'''Receive data, blocking.'''
 
+    async def recv_many(self, max_n: int = 32) -> List[Optional[bytearray]]:
+        '''Receive at least one and up to max_n packets, blocking.'''
+        return [await self.recv()]
+
     def repr(self):
         return f'{self.__class__}, {self.name}'
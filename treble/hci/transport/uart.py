@@ -4,11 +4,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import asyncio
+import collections
 import errno
 import logging
+import os
 import serial
+import socket
+import sys
 import threading
-from typing import Optional
+import time
+from typing import List, Optional
 
 from ..cmd import HCICmd
 from ..evt import HCIEvt
@@ -18,6 +23,11 @@ from ...util import hex
 
 log = logging.getLogger('treble.hci.transport.uart')
 
+# RX packet class and header length, indexed by packet indicator. Padded to
+# cover every byte value, so that any indicator can index them.
+_IND_CLASSES = (None, None, HCIACLData, None, HCIEvt) + (None,) * 251
+_IND_HDR_LEN = (0, 0, HCIACLData.HEADER_LEN, 0, HCIEvt.HEADER_LEN) + (0,) * 251
+
 class StreamTransport(HCITransport):
 
     # Packet indicators
@@ -27,72 +37,178 @@ class StreamTransport(HCITransport):
     IND_SCO = 0x3
     IND_EVT = 0x4
 
+    # RX states
+    S_IND = 0
+    S_HDR = 1
+    S_PAY = 2
+
     def __init__(self, name: str):
         super().__init__(name)
         # Init RX states
-        self._rx_state = StreamTransport.IND_NONE
+        self._rx_state = StreamTransport.S_IND
         self._rx_pkt = None
         self._rx_remain = 0
-        self._rx_hdr = False
-
-    def _prepend_ind(self, pkt: Packet) -> bytes:
-        ind : int = StreamTransport.IND_NONE
+        # Chunk holding bytes that followed a completed packet, and the
+        # offset of the first of them
+        self._rx_data = b''
+        self._rx_off = 0
+        # RX state handlers, indexed by state
+        self._rx_handlers = (self._rx_wait_ind, self._rx_wait_hdr,
+                             self._rx_wait_pay)
+
+    def _prepend_ind(self, pkt: Packet) -> bytearray:
+        # The packet's backing store reserves its first byte for the
+        # indicator, so it can be written out as is
         if isinstance(pkt, HCIACLData):
-            ind = StreamTransport.IND_ACL
+            pkt._buf[0] = StreamTransport.IND_ACL
         elif isinstance(pkt, HCICmd):
-            ind = StreamTransport.IND_CMD
+            pkt._buf[0] = StreamTransport.IND_CMD
         else:
-            raise RuntimeException('invalid packet type')
-
-        return bytes([ind]) + pkt.data
+            raise RuntimeError('invalid packet type')
+        return pkt._buf
+
+    def _rx_copy(self, data: bytes, idx: int, dlen: int) -> int:
+        # copy as much as available
+        pkt = self._rx_pkt
+        clen = min(self._rx_remain, dlen)
+        # Copy into the preallocated buffer, a single memcpy per chunk
+        # instead of reallocating the whole packet on every read
+        with memoryview(pkt._buf) as mv, memoryview(data) as src:
+            mv[pkt._cur:pkt._cur + clen] = src[idx:idx + clen]
+        pkt._cur += clen
+        self._rx_remain -= clen
+        return clen
+
+    def _rx_resync(self, data: bytes, idx: int) -> int:
+        # Find the next byte that can be an indicator, bytes.find() is a
+        # memchr() scan in C. Returns len(data) if there is none.
+        nxt = len(data)
+        for ind in (StreamTransport.IND_ACL, StreamTransport.IND_EVT):
+            pos = data.find(ind, idx, nxt)
+            if pos >= 0:
+                nxt = pos
+        return nxt
+
+    def _rx_fast(self, data: bytes, idx: int) -> Optional[Packet]:
+        # Fast path: a whole packet at idx in the chunk, parse it in one shot
+        # without going through the state machine
+        ind = data[idx]
+        cls = _IND_CLASSES[ind]
+        if cls is None:
+            # Let the state machine resynchronize
+            return None
+        hlen = _IND_HDR_LEN[ind]
+        dlen = len(data) - idx
+        if dlen < 1 + hlen:
+            return None
+        pkt = cls.obtain()
+        # The packet starts with the indicator, just like the packet's
+        # backing store, so parse the header straight from the chunk
+        pkt._buf = data
+        pkt.idx = idx
+        pkt.unpack_header()
+        total = 1 + hlen + pkt.payload_len()
+        if dlen < total:
+            pkt.release()
+            return None
+        pkt._buf = bytearray(memoryview(data)[idx:idx + total])
+        pkt._cur = total
+        pkt.idx = hlen
+        self._rx_data = data
+        self._rx_off = idx + total
+        return pkt
 
-    def _rx(self, data: bytes) -> Optional[Packet]:
-        log.debug(f'read: {hex(data, "-")}')
+    def _rx_wait_ind(self, data: bytes, idx: int, dlen: int) -> tuple:
+        ind = data[idx]
+        cls = _IND_CLASSES[ind]
+        if cls is None:
+            # Out of sync, skip to the next candidate indicator
+            nxt = self._rx_resync(data, idx + 1)
+            log.warning(f'Unexpected or invalid indicator {ind}, '
+                        f'skipping {nxt - idx} bytes')
+            return StreamTransport.S_IND, nxt, dlen - (nxt - idx), None
+        self._rx_pkt = cls.obtain()
+        self._rx_remain = _IND_HDR_LEN[ind]
+        self._rx_pkt._buf = bytearray(1 + self._rx_remain)
+        self._rx_pkt._buf[0] = ind
+        self._rx_pkt._cur = 1
+        return StreamTransport.S_HDR, idx + 1, dlen - 1, None
+
+    def _rx_wait_hdr(self, data: bytes, idx: int, dlen: int) -> tuple:
+        clen = self._rx_copy(data, idx, dlen)
+        if self._rx_remain:
+            # More bytes required
+            return StreamTransport.S_HDR, idx + clen, dlen - clen, None
+        # Header complete, parse it
+        self._rx_pkt.unpack_header()
+        self._rx_remain = self._rx_pkt.payload_len()
+        # Grow the buffer once to fit the payload
+        self._rx_pkt._buf.extend(bytes(self._rx_remain))
+        if self._rx_remain:
+            return StreamTransport.S_PAY, idx + clen, dlen - clen, None
+        # Empty payload, packet complete
+        pkt = self._rx_pkt
+        self._rx_pkt = None
+        return StreamTransport.S_IND, idx + clen, dlen - clen, pkt
+
+    def _rx_wait_pay(self, data: bytes, idx: int, dlen: int) -> tuple:
+        clen = self._rx_copy(data, idx, dlen)
+        if self._rx_remain:
+            # More bytes required
+            return StreamTransport.S_PAY, idx + clen, dlen - clen, None
+        pkt = self._rx_pkt
+        self._rx_pkt = None
+        return StreamTransport.S_IND, idx + clen, dlen - clen, pkt
+
+    def _rx_many(self, data: bytes) -> List[Packet]:
+        '''Feed received bytes, returns all the packets completed.'''
+        pkts = []
+        pkt = self._rx(data)
+        while pkt:
+            pkts.append(pkt)
+            pkt = self._rx()
+        return pkts
+
+    def _rx(self, data: bytes = b'') -> Optional[Packet]:
+        '''Feed received bytes, returns a packet if one was completed.
+
+        Only one packet is returned per call. Bytes following it are kept and
+        consumed first by the next call, so callers must keep calling with no
+        data until None is returned.'''
+        # Avoid formatting the data unless it is going to be logged
+        if data and log.isEnabledFor(logging.DEBUG):
+            log.debug('read: %s', hex(data, '-'))
         idx : int = 0
-        dlen : int = len(data)
-        while(dlen):
-
-            # copy as much as available
-            if self._rx_remain:
-                clen = min(self._rx_remain, dlen)
-                # Use += to ensure in-place concatenation without creating a
-                # new object  This should be faster than extend()
-                self._rx_pkt.data += data[idx:idx + clen]
-                idx += clen
-                self._rx_remain -= clen
-                dlen -= clen
-                if self._rx_remain:
-                    # More bytes required
-                    return None
-
-            if self._rx_state == StreamTransport.IND_NONE:
-                ind = data[0]
-                idx += 1
-                dlen -= 1
-                self._rx_state = ind
-                if ind == StreamTransport.IND_ACL:
-                    self._rx_pkt = HCIACLData()
-                    self._rx_remain = self._rx_pkt.header_len()
-                elif ind == StreamTransport.IND_EVT:
-                    self._rx_pkt = HCIEvt()
-                    self._rx_remain = self._rx_pkt.header_len()
-                else:
-                    raise RuntimeError(f'Unexpected or invalid indicator {ind}')
-            elif not self._rx_hdr:
-                # Header complete, parse it
-                self._rx_pkt.unpack_header()
-                if self._rx_state == StreamTransport.IND_ACL:
-                    self._rx_remain = self._rx_pkt.payload_len()
-                else:
-                    self._rx_remain = self._rx_pkt.payload_len()
-                self._rx_hdr = True
+        if self._rx_off < len(self._rx_data):
+            # Carry on from where the previous packet ended, without copying
+            # the rest of the chunk
+            if data:
+                data = self._rx_data[self._rx_off:] + data
             else:
-                pkt = self._rx_pkt
-                self._rx_pkt = None
-                self._rx_state = StreamTransport.IND_NONE
-                self._rx_hdr = False
+                data = self._rx_data
+                idx = self._rx_off
+        self._rx_data = b''
+        self._rx_off = 0
+        dlen : int = len(data) - idx
+        if not dlen:
+            return None
+
+        if self._rx_state == StreamTransport.S_IND:
+            pkt = self._rx_fast(data, idx)
+            if pkt:
                 return pkt
 
+        state : int = self._rx_state
+        while dlen:
+            state, idx, dlen, pkt = self._rx_handlers[state](data, idx, dlen)
+            if pkt:
+                self._rx_state = state
+                self._rx_data = data
+                self._rx_off = idx
+                return pkt
+        self._rx_state = state
+        return None
+
 class TCPProtocol(asyncio.Protocol):
     def __init__(self, hci_transport):
         self._hci_transport = hci_transport
@@ -101,21 +217,25 @@ class TCPProtocol(asyncio.Protocol):
         self._transport = transport
 
     def data_received(self, data):
-        pkt = self._hci_transport._rx(data)
-        if pkt:
+        for pkt in self._hci_transport._rx_many(data):
             self._hci_transport._rx_q.put_nowait(pkt)
 
     def connection_lost(self, exc):
-        pass
+        # Closed by either end, the public RX path is now disabled
+        self._hci_transport._open = False
+        self._hci_transport._rx_q.put_nowait(None)
     
 class UARToTCP(StreamTransport):
+
+    # Kernel socket send and receive buffer size
+    SOCK_BUF_SIZE = 1 << 18
+
     def __init__(self):
         super().__init__(HCI_TRANSPORT_TCP)
         self._open = False
         self._closing = False
         self._rx_q = asyncio.Queue()
-        self._loop = asyncio.get_event_loop()
-        self._tx_lock = asyncio.Lock(loop=self._loop)
+        self._tx_lock = asyncio.Lock()
 
     async def open(self, dev : str, **kwargs) -> None:
         if self._open or self._closing:
@@ -124,25 +244,39 @@ class UARToTCP(StreamTransport):
         host, _, port = dev.partition(':')
         port = int(port)
         log.info(f'opening TCP connection to {host}:{port}')
+        self._loop = asyncio.get_running_loop()
         self._transport, self._protocol = await self._loop.create_connection(
                         lambda: TCPProtocol(self), host, port) 
+        sock = self._transport.get_extra_info('socket')
+        if sock is not None:
+            # HCI traffic is made of small, latency-sensitive packets, do not
+            # let Nagle's algorithm hold them back
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+                            UARToTCP.SOCK_BUF_SIZE)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                            UARToTCP.SOCK_BUF_SIZE)
         self._open = True
 
     async def close(self):
-        async with self._tx_lock():
-            self._closing = True
-            self._open = False
-            await self._rx_q.join()
+        # Flag it first, so that pending sends fail right away
+        self._closing = True
+        self._open = False
+        async with self._tx_lock:
             self._transport.close()
             #await self._close_future
-            self._closing = False
+        self._closing = False
 
     async def send(self, pkt: Packet) -> None:
         if not self._open:
             raise OSError(errno.ENODEV)
         async with self._tx_lock:
+            if not self._open:
+                # Closed while waiting for the lock
+                raise OSError(errno.ENODEV)
             txd = self._prepend_ind(pkt)
-            log.debug(f'writing {hex(txd, "-")}')
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug('writing %s', hex(txd, '-'))
             try:
                 self._transport.write(txd)
             except OSError as e:
@@ -156,19 +290,57 @@ class UARToTCP(StreamTransport):
         self._rx_q.task_done()
         return pkt
 
+    async def recv_many(self, max_n: int = 32) -> List[Optional[Packet]]:
+        if not self._open:
+            raise OSError(errno.ENODEV)
+        pkt = await self._rx_q.get()
+        self._rx_q.task_done()
+        out = [pkt]
+        # Drain whatever is already queued without yielding to the loop
+        while pkt and len(out) < max_n:
+            try:
+                pkt = self._rx_q.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._rx_q.task_done()
+            out.append(pkt)
+        return out
+
 
 class UART(StreamTransport):
 
     # Initial baudrate
     INIT_BAUDRATE = 9600
 
+    # Maximum number of bytes per serial read
+    RX_READ_SIZE = 4096
+    # Serial read timeout in seconds, when using the RX thread. A read returns
+    # early only once RX_READ_SIZE bytes have arrived, so this is also the
+    # worst-case latency a batch adds to a packet. It bounds how long the RX
+    # thread takes to notice the transport being closed too.
+    RX_READ_TIMEOUT = 0.002
+
+    # RX ring buffer capacity, must be a power of two
+    RX_RING_SIZE = 256
+
     def __init__(self):
         super().__init__(HCI_TRANSPORT_UART)
         self._open = False
         self._closing = False
-        self._rx_q = asyncio.Queue()
-        self._loop = asyncio.get_event_loop()
-        self._tx_lock = asyncio.Lock(loop=self._loop)
+        # Single-producer (RX thread), single-consumer (event loop) ring.
+        # The head is only written by the RX thread and the tail only by the
+        # loop, the GIL makes each of these plain int stores atomic.
+        self._rx_ring : List[Optional[Packet]] = [None] * UART.RX_RING_SIZE
+        self._rx_head = 0
+        self._rx_tail = 0
+        # Set when the ring goes from empty to non-empty
+        self._rx_evt = asyncio.Event()
+        # Serial port file descriptor when polled by the event loop instead
+        # of read by the RX thread
+        self._rx_fd : Optional[int] = None
+        # Packets that did not fit in the ring while polling
+        self._rx_backlog : Optional[List[Optional[Packet]]] = None
+        self._tx_lock = asyncio.Lock()
 
     async def open(self, dev : str, **kwargs) -> None:
         if self._open or self._closing:
@@ -185,8 +357,9 @@ class UART(StreamTransport):
         kwargs['parity'] = 'N'
         kwargs['stopbits'] = 1
         kwargs['rtscts'] = True
-        # Wait forever in the rx thread
-        kwargs['timeout'] = None
+        # Block the rx thread until a batch of bytes arrives or the timeout
+        # expires
+        kwargs['timeout'] = UART.RX_READ_TIMEOUT
         kwargs['write_timeout'] = None
         # Force baudrate to a slow, unusable one initially
         kwargs['baudrate'] = UART.INIT_BAUDRATE
@@ -198,45 +371,242 @@ class UART(StreamTransport):
         # Force a baudrate change, some onboard debuggers require seeing a
         # baudrate change in order to start hardware flow control
         self._serial.baudrate = self._baudrate
+        self._loop = asyncio.get_running_loop()
         self._open = True
-        self._rx_thread = threading.Thread(target=self._rx_thread_fn,
+        if not self._rx_reader_start():
+            self._rx_thread = threading.Thread(target=self._rx_thread_fn,
+                                               daemon=True)
+            self._rx_thread.start()
+        # Writes are queued and coalesced by a dedicated TX thread
+        self._tx_deque = collections.deque()
+        self._tx_cond = threading.Condition()
+        self._tx_thread = threading.Thread(target=self._tx_thread_fn,
                                            daemon=True)
-        self._rx_thread.start()
+        self._tx_thread.start()
 
     async def close(self):
-        async with self._tx_lock():
-            self._closing = True
-            self._open = False
-            await self._loop.run_in_executor(None, self._rx_thread.join())
-            await self._rx_q.join()
+        # Flag it first, so that pending sends fail right away
+        self._closing = True
+        self._open = False
+        async with self._tx_lock:
+            # Let the TX thread drop what is queued and exit
+            with self._tx_cond:
+                self._tx_cond.notify()
+        # Unblock a write held off by flow control
+        self._serial.cancel_write()
+        await self._loop.run_in_executor(None, self._tx_thread.join)
+        if self._rx_fd is not None:
+            self._loop.remove_reader(self._rx_fd)
+            # The public RX path is now disabled
+            self._rx_end()
+        else:
+            # Unblock a pending read so that the RX thread exits right away
             self._serial.cancel_read()
-            self._serial.close()
-            self._closing = False
+            await self._loop.run_in_executor(None, self._rx_thread.join)
+        self._serial.close()
+        self._closing = False
 
     async def send(self, pkt: Packet) -> None:
         if not self._open:
             raise OSError(errno.ENODEV)
         async with self._tx_lock:
+            if not self._open:
+                # Closed while waiting for the lock
+                raise OSError(errno.ENODEV)
             txd = self._prepend_ind(pkt)
-            log.debug(f'writing {hex(txd, "-")}')
-            try:
-                written = await self._loop.run_in_executor(None,
-                                                           self._serial.write,
-                                                           txd)
-                #assert(written == 1)
-            except serial.SerialException as e:
-                log.error(f'rx exception: {e}')
-                raise OSError(e.errno, e.strerror) from None
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug('writing %s', hex(txd, '-'))
+            # Hand over to the TX thread, which resolves the future once the
+            # data has been written
+            fut = self._loop.create_future()
+            with self._tx_cond:
+                self._tx_deque.append((txd, fut))
+                self._tx_cond.notify()
+        # Wait outside of the lock, so that concurrent sends can be coalesced
+        await fut
 
     async def recv(self, timeout: int = 0) -> Optional[Packet]:
         if not self._open:
             raise OSError(errno.ENODEV)
-        pkt = await self._rx_q.get()
-        self._rx_q.task_done()
+        await self._rx_wait()
+        return self._rx_get()
+
+    async def recv_many(self, max_n: int = 32) -> List[Optional[Packet]]:
+        if not self._open:
+            raise OSError(errno.ENODEV)
+        await self._rx_wait()
+        pkt = self._rx_get()
+        out = [pkt]
+        # Drain whatever is already queued without yielding to the loop
+        while pkt and len(out) < max_n and self._rx_tail != self._rx_head:
+            pkt = self._rx_get()
+            out.append(pkt)
+        return out
+
+    async def _rx_wait(self) -> None:
+        while self._rx_tail == self._rx_head:
+            self._rx_evt.clear()
+            # The RX thread may have filled the ring before the clear
+            if self._rx_tail != self._rx_head:
+                break
+            await self._rx_evt.wait()
+
+    def _rx_get(self) -> Optional[Packet]:
+        # Called from the event loop only
+        tail = self._rx_tail
+        slot = tail & (UART.RX_RING_SIZE - 1)
+        pkt = self._rx_ring[slot]
+        self._rx_ring[slot] = None
+        self._rx_tail = tail + 1
+        if self._rx_backlog:
+            # There is room again, move the backlog over and resume polling
+            # the port once it has been flushed
+            pkts, self._rx_backlog = self._rx_backlog, None
+            self._rx_put(pkts)
+            if (not self._rx_backlog and self._open and
+                self._rx_fd is not None):
+                self._loop.add_reader(self._rx_fd, self._rx_readable)
         return pkt
 
-    def _rx_enq(self, pkt: Packet) -> None:
-        self._rx_q.put_nowait(pkt)
+    def _rx_put(self, pkts: List[Optional[Packet]]) -> None:
+        # Called from the RX thread, or from the loop when polling. All the
+        # packets are published at once, so that the loop is woken up at most
+        # once per batch.
+        start = head = self._rx_head
+        for i, pkt in enumerate(pkts):
+            if head - self._rx_tail == UART.RX_RING_SIZE:
+                # Ring full, publish what we have and stop reading, letting
+                # flow control hold the controller off until the loop
+                # catches up
+                self._rx_publish(start, head)
+                start = head
+                if self._rx_fd is not None:
+                    # Running on the loop, cannot wait here. Keep the rest
+                    # behind anything already waiting for room.
+                    self._rx_backlog = (self._rx_backlog or []) + pkts[i:]
+                    self._loop.remove_reader(self._rx_fd)
+                    return
+                while head - self._rx_tail == UART.RX_RING_SIZE:
+                    if not self._open:
+                        # Closing, the loop may never make room again, drop
+                        # the rest of the batch
+                        return
+                    time.sleep(0.001)
+            self._rx_ring[head & (UART.RX_RING_SIZE - 1)] = pkt
+            head += 1
+        self._rx_publish(start, head)
+
+    def _rx_end(self) -> None:
+        # Called from the event loop only. Publishes the end of stream marker
+        # without waiting for room in the ring.
+        if (self._rx_backlog or
+            self._rx_head - self._rx_tail == UART.RX_RING_SIZE):
+            # Queue it behind whatever is waiting for room
+            self._rx_backlog = (self._rx_backlog or []) + [None]
+        else:
+            self._rx_put([None])
+
+    def _rx_publish(self, start: int, head: int) -> None:
+        if start == head:
+            return
+        self._rx_head = head
+        if start == self._rx_tail:
+            # Ring was empty, the loop may be waiting
+            if self._rx_fd is not None:
+                self._rx_evt.set()
+            else:
+                self._loop.call_soon_threadsafe(self._rx_evt.set)
+
+    def _rx_reader_start(self) -> bool:
+        # On Linux the serial port can be polled by the event loop, which
+        # reads and parses straight from it without an RX thread
+        self._rx_fd = None
+        if not sys.platform.startswith('linux'):
+            return False
+        fd = self._serial.fileno()
+        # Drain UART
+        self._serial.reset_input_buffer()
+        try:
+            self._loop.add_reader(fd, self._rx_readable)
+        except NotImplementedError:
+            # The event loop does not support polling file descriptors
+            return False
+        self._rx_fd = fd
+        log.debug(f'polling serial port fd {fd}')
+        return True
+
+    def _rx_readable(self) -> None:
+        # The serial port is opened non-blocking, and the loop only calls us
+        # when there is data to be read
+        try:
+            data = os.read(self._rx_fd, UART.RX_READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            log.error(f'rx exception: {e}')
+            data = b''
+        if not data:
+            # Device gone, the public RX path is now disabled
+            self._loop.remove_reader(self._rx_fd)
+            self._open = False
+            self._rx_end()
+            return
+        pkts = self._rx_many(data)
+        if pkts:
+            self._rx_put(pkts)
+
+    def _tx_thread_fn(self) -> None:
+        id = threading.current_thread()
+        log.debug(f'tx thread started: {id}')
+        while True:
+            with self._tx_cond:
+                while not self._tx_deque and self._open:
+                    self._tx_cond.wait()
+                if not self._tx_deque or self._closing:
+                    # Closed, anything left is dropped below
+                    break
+                batch = list(self._tx_deque)
+                self._tx_deque.clear()
+            # Coalesce everything queued so far into a single write
+            if len(batch) == 1:
+                txd = batch[0][0]
+            else:
+                txd = b''.join([txd for txd, _ in batch])
+            try:
+                n = self._serial.write(txd)
+            except serial.SerialException as e:
+                log.error(f'tx exception: {e}')
+                self._tx_done(batch, (errno.EIO, str(e)))
+                break
+            if n is not None and n < len(txd):
+                # Write cancelled on close
+                self._tx_done(batch, (errno.ENODEV, os.strerror(errno.ENODEV)))
+                break
+            self._tx_done(batch, None)
+
+        self._open = False
+        # Fail whatever could not be written
+        with self._tx_cond:
+            batch = list(self._tx_deque)
+            self._tx_deque.clear()
+        self._tx_done(batch, (errno.ENODEV, os.strerror(errno.ENODEV)))
+        log.debug(f'tx thread exited: {id}')
+
+    def _tx_done(self, batch: list, err: Optional[tuple]) -> None:
+        # Called from the TX thread, wakes up the senders of a batch
+        if batch:
+            self._loop.call_soon_threadsafe(self._tx_resolve,
+                                            [fut for _, fut in batch], err)
+
+    def _tx_resolve(self, futs: list, err: Optional[tuple]) -> None:
+        for fut in futs:
+            if fut.done():
+                # Sender cancelled
+                continue
+            if err:
+                fut.set_exception(OSError(*err))
+            else:
+                fut.set_result(None)
 
     def _rx_thread_fn(self) -> None:
         id = threading.current_thread()
@@ -245,17 +615,20 @@ class UART(StreamTransport):
         self._serial.reset_input_buffer()
         while self._open and self._serial.is_open:
             try:
-                data = self._serial.read(max(1, self._serial.in_waiting))
-                pkt = self._rx(data)
-                if pkt:
-                    # Packet completed, dispatch it
-                    self._loop.call_soon_threadsafe(self._rx_enq, pkt)
+                data = self._serial.read(UART.RX_READ_SIZE)
+                if not data:
+                    continue
+                # Parse the whole batch, then dispatch the completed packets
+                pkts = self._rx_many(data)
+                if pkts:
+                    self._rx_put(pkts)
             except Exception as e:
                 log.error(f'rx exception: {e}')
                 break
 
         self._open = False
-        # The public RX path is now disabled
-        self._rx_enq(None)
+        # The public RX path is now disabled. The marker is published from the
+        # loop, so that the thread never blocks on a full ring when exiting.
+        self._loop.call_soon_threadsafe(self._rx_end)
         log.debug(f'rx thread exited: {id}')
 
@@ -29,6 +29,13 @@ class Monitor:
 
     def __init__(self):
         self.counts = {}
+        # Per (direction, packet type) handlers
+        self._dispatch = {
+            (TX, HCICmd): lambda pkt: self._cmd(pkt.data),
+            (RX, HCIEvt): lambda pkt: self._evt(pkt.data),
+            (TX, HCIACLData): lambda pkt: self._acl(TX, pkt.data),
+            (RX, HCIACLData): lambda pkt: self._acl(RX, pkt.data),
+        }
 
     def feed_rx(self, cidx, pkt):
         self._feed(RX, cidx, pkt)
@@ -37,18 +44,10 @@ class Monitor:
         self._feed(TX, cidx, pkt)
 
     def _feed(self, dir: str, cidx: int, pkt):
-        #print(pkt)
-        #print(type(pkt))
-        if isinstance(pkt, bytes) or isinstance(pkt, bytearray):
-            raise NotImplementedError
-        elif dir == TX and isinstance(pkt, HCICmd):
-            self._cmd(pkt.data)
-        elif dir == RX and isinstance(pkt, HCIEvt):
-            self._evt(pkt.data)
-        elif isinstance(pkt, HCIACLData):
-            self._acl(dir, pkt.data)
-        else:
+        fn = self._dispatch.get((dir, type(pkt)))
+        if fn is None:
             raise NotImplementedError
+        fn(pkt)
 
     def _cmd(self, data: bytes):
         #cmd = HCICmd(data)
@@ -10,24 +10,63 @@ from typing import Any, Optional
 
 class Packet:
 
+    # Free list of recycled instances, only enabled for the received packet
+    # types, which define their own list
+    _pool : Optional[list] = None
+    # Maximum number of instances kept in each free list
+    POOL_SIZE = 64
+
     def __init__(self, hdr_cls: Optional[type] = None,
-                 data: Optional[bytes] = None, copy: bool = False):
+                 data: Optional[bytes] = None):
+        # Single backing store for the packet's whole life cycle. The first
+        # byte is reserved for the stream transports' packet indicator, so
+        # that both RX and TX work in place without copying the packet.
+        self._buf = bytearray(1)
         if data:
-            self.data = bytearray(data) if copy else data
-        else:
-            self.data = bytearray()
+            self._buf += data
+        # Write cursor into _buf, used by the stream transports when
+        # reassembling a received packet
+        self._cur : int = 1
         self.idx = 0
         self.hdr_cls = hdr_cls
 
+    @classmethod
+    def obtain(cls) -> 'Packet':
+        '''Get a recycled packet, or a new one if there is none.'''
+        # The free lists are shared by all transports, which may be
+        # receiving from different threads, so just try to pop
+        try:
+            return cls._pool.pop()
+        except (AttributeError, IndexError):
+            return cls()
+
+    def release(self) -> None:
+        '''Return the packet for recycling, it must not be used afterwards.'''
+        pool = type(self)._pool
+        if pool is not None and len(pool) < Packet.POOL_SIZE:
+            self.reset()
+            pool.append(self)
+
+    def reset(self) -> None:
+        # Drop the contents, leaving the packet as if just created
+        self._buf = bytearray(1)
+        self._cur = 1
+        self.idx = 0
+
+    @property
+    def data(self) -> memoryview:
+        '''Packet contents, without the indicator.'''
+        return memoryview(self._buf)[1:]
+
     def unpack(self, cls : type) -> object:
         assert cls.sig
         s = struct.calcsize(cls.sig)
-        t = struct.unpack(cls.sig, self.data[self.idx : self.idx + s])
+        t = struct.unpack_from(cls.sig, self._buf, 1 + self.idx)
         self.idx += s
         return cls(*t)
 
     def pack(self, obj: Any) -> None:
-        self.data[:0] = struct.pack(obj.sig, *astuple(obj))
+        self._buf[1:1] = struct.pack(obj.sig, *astuple(obj))
 
     def header_len(self) -> int:
         return struct.calcsize(self.hdr_cls.sig)
@@ -45,16 +84,24 @@ class HCIACLHdr:
     handle : int
     dlen : int
 
+# Precompiled header unpacker
+_ACL_HDR = struct.Struct(HCIACLHdr.sig)
+
 class HCIACLData(Packet):
 
+    HEADER_LEN = _ACL_HDR.size
+
+    _pool = []
+
     def __init__(self, data : bytes = None):
-        super().__init__(data)
+        super().__init__(data=data)
 
     def header_len(self):
-        return struct.calcsize(HCIACLHdr.sig)
+        return HCIACLData.HEADER_LEN
 
     def unpack_header(self):
-            self.hdr = self.unpack(HCIACLHdr)
+        self.hdr = HCIACLHdr(*_ACL_HDR.unpack_from(self._buf, 1 + self.idx))
+        self.idx += HCIACLData.HEADER_LEN
 
     def payload_len(self):
         return self.hdr.dlen
@@ -18,10 +18,13 @@ def timestamp() -> str:
     s += f'.{(t % 1) * 1000000:06.0f}'
     return s
 
-def hex(b: bytes, sep: str) -> str:
-    if pyver.minor >= 8:
-        return b.hex(sep)
-    else:
+# Pick the implementation once, bytes.hex() takes a separator and formats it
+# in C from 3.8 onwards
+if pyver.minor >= 8:
+    def hex(b: bytes, sep: str) -> str:
+        return b.hex(sep) if sep else b.hex()
+else:
+    def hex(b: bytes, sep: str) -> str:
         s = b.hex()
-        return sep.join([''.join(c) for c in zip(*[iter(s)]*2)])
+        return sep.join([s[i:i + 2] for i in range(0, len(s), 2)])
 